@@ -1,7 +1,9 @@
 # main.py
 
 import argparse
+import pandas as pd
 from trading_bot.backtesting.engine import Backtester
+from trading_bot.backtesting.parallel import run_many
 from trading_bot.config import settings
 
 def main():
@@ -9,8 +11,11 @@ def main():
 
     parser.add_argument('--mode', type=str, choices=['backtest', 'live'], required=True,
                         help="The mode to run the bot in: 'backtest' or 'live'.")
-    parser.add_argument('--symbol', type=str, required=True,
-                        help="The stock or index symbol to trade (e.g., 'BANKNIFTY').")
+    symbol_group = parser.add_mutually_exclusive_group(required=True)
+    symbol_group.add_argument('--symbol', type=str,
+                              help="The stock or index symbol to trade (e.g., 'BANKNIFTY').")
+    symbol_group.add_argument('--symbols', type=str,
+                              help="Comma-separated symbols to backtest in parallel (e.g., 'BANKNIFTY,NIFTY').")
     parser.add_argument('--start_date', type=str, default='2023-01-01',
                         help="Start date for backtesting (YYYY-MM-DD).")
     parser.add_argument('--end_date', type=str, default='2023-01-31',
@@ -23,23 +28,60 @@ def main():
                         help="Stop-loss in points.")
     parser.add_argument('--lot_size', type=int, default=15,
                         help="Lot size for the instrument.")
+    parser.add_argument('--sweep_sl', type=str,
+                        help="Comma-separated stop-loss points to sweep in backtest mode (e.g., '30,50,80').")
 
     args = parser.parse_args()
 
     if args.mode == 'backtest':
         print("--- Starting Backtest Mode ---")
-        backtester = Backtester(
-            symbol=args.symbol,
-            start_date=args.start_date,
-            end_date=args.end_date,
-            capital=args.capital,
-            risk_percent=args.risk,
-            sl_points=args.sl_points,
-            lot_size=args.lot_size
-        )
-        backtester.run()
+        symbols = args.symbols.split(',') if args.symbols else [args.symbol]
+        sl_values = [float(sl) for sl in args.sweep_sl.split(',')] if args.sweep_sl else [args.sl_points]
+
+        if len(symbols) == 1 and len(sl_values) == 1:
+            backtester = Backtester(
+                symbol=symbols[0],
+                start_date=args.start_date,
+                end_date=args.end_date,
+                capital=args.capital,
+                risk_percent=args.risk,
+                sl_points=sl_values[0],
+                lot_size=args.lot_size
+            )
+            backtester.run()
+            return
+
+        # Fan the symbol x stop-loss grid out across worker processes
+        configs = [
+            {
+                'symbol': symbol,
+                'start_date': args.start_date,
+                'end_date': args.end_date,
+                'capital': args.capital,
+                'risk_percent': args.risk,
+                'sl_points': sl_points,
+                'lot_size': args.lot_size
+            }
+            for symbol in symbols
+            for sl_points in sl_values
+        ]
+        results = run_many(configs)
+
+        frames = [
+            result['trades'].assign(sl_points=result['config']['sl_points'])
+            for result in results if len(result['trades'])
+        ]
+        print("\n--- Combined Backtest Results ---")
+        if not frames:
+            print("No trades were executed.")
+            return
+
+        all_trades = pd.concat(frames, ignore_index=True)
+        print(all_trades.groupby(['symbol', 'sl_points'])['pnl'].agg(['count', 'sum', 'mean']))
 
     elif args.mode == 'live':
+        if args.symbols:
+            parser.error("--symbols is only supported in backtest mode.")
         print("--- Starting Live Trading Mode ---")
         print("NOTE: Live trading logic is not yet implemented.")
         print("This section is a placeholder for connecting to the broker and executing live trades.")
@@ -49,16 +91,30 @@ def main():
         #    from trading_bot.core.api import get_dhan_api_instance
         #    dhan = get_dhan_api_instance()
         #
+        #    Create the indicator state once, so each new candle updates it in O(1)
+        #    instead of recomputing over the full history:
+        #    from trading_bot.utils.indicators import StreamingVWAP, StreamingEMA
+        #    vwap_stream = StreamingVWAP()
+        #    ema_stream = StreamingEMA(length=25)
+        #
         # 2. Start a loop that runs every minute/second
         #    while True:
         #
         # 3. Fetch live data for the symbol
         #    - Get 5-min and 15-min candles
         #    - This will require using the DhanHQ websocket or polling REST API
+        #    - When polling via get_historical_data, pass cache_bypass=True so each
+        #      call returns fresh candles instead of a memoized result
         #
         # 4. Calculate indicators (VWAP, EMA) on the live data
+        #    - On each new 5-min candle: vwap = vwap_stream.update(high, low, close, volume, timestamp)
+        #    - On each completed 15-min candle: ema = ema_stream.update(close_15min)
         #
         # 5. Check for entry/exit signals using the strategy functions
+        #    - Keep the previous close/VWAP/EMA as plain floats and call
+        #      check_entry_signal(close_prev, close, vwap_prev, vwap, ema_prev, ema)
+        #    - Keep the 15-min highs in a NumPy array and call
+        #      check_exit_signal(high_15min, n_15min); look up timestamps only when a signal fires
         #
         # 6. If a signal is found, execute a trade using the DhanHQ API
         #    - Get ATM option
@@ -1,9 +1,129 @@
 # trading_bot/backtesting/engine.py
 
+import functools
+import numpy as np
 import pandas as pd
 from trading_bot.config import settings
-from trading_bot.utils.indicators import get_historical_data, calculate_vwap, calculate_ema
-from trading_bot.core.strategy import check_entry_signal, check_exit_signal, calculate_position_size
+from trading_bot.utils.indicators import get_historical_data, calculate_vwap, calculate_ema, resample_ohlcv
+from trading_bot.core.strategy import calculate_position_size
+from trading_bot.utils._njit import njit
+
+# Exit reason codes written by the backtest kernel
+REASON_STOP_LOSS = 0
+REASON_REVERSE_SWING = 1
+TRADE_EXIT_REASONS = ("Stop-Loss Hit", "Reverse Swing Exit")
+
+# Timestamp sentinel for "never happened" (the int64 value of pd.NaT)
+NAT_NS = np.iinfo(np.int64).min
+
+
+@functools.lru_cache(maxsize=None)
+def make_kernel(sl_points, lot_size):
+    """
+    Builds the backtest kernel for a fixed stop-loss and lot size.
+
+    Both values are compile-time constants of the returned function, so numba
+    folds the SL and PnL arithmetic instead of passing them on every call.
+    Kernels are memoized per (sl_points, lot_size), and the compiled code is
+    cached on disk, so sweeps only compile each configuration once.
+
+    Args:
+        sl_points (float): Stop-loss in points.
+        lot_size (int): The number of shares/units in one lot.
+
+    Returns:
+        function: The compiled run_loop kernel.
+    """
+    @njit(cache=True)
+    def run_loop(close, high, low, entry_signal, high_15min, index_5min_ns, index_15min_ns,
+                 position_size,
+                 entry_ns, exit_ns, breakeven_ns,
+                 entry_price_buf, exit_price_buf, pnl_buf, reason_buf):
+        """
+        Runs the strategy over the 5-min candles and writes each trade into the output buffers.
+
+        entry_signal holds the entry condition for every 5-min candle, so the
+        loop only has to look it up, follow the 15-min highs and apply the SL logic.
+
+        Trade k occupies slot k of every buffer. breakeven_ns is NAT_NS if the SL
+        never moved to breakeven. If a trade is still open at the end, its entry is
+        stored in slot n_trades.
+
+        Returns:
+            tuple: (number of closed trades, whether a trade is still open)
+        """
+        n_trades = 0
+        in_trade = False
+        entry_price = 0.0
+        sl_price = 0.0
+        breakeven_price = 0.0
+        sl_at_breakeven = False
+
+        # Both indices are sorted, so the last 15-min candle that has started by
+        # the current 5-min candle only ever moves forward
+        j15 = -1
+        n_15min = len(index_15min_ns)
+
+        # Highs of the forming 15-min candle, the last completed one and the one before it
+        h_forming = np.nan
+        h_m1 = np.nan
+        h_m2 = np.nan
+        have_three_15min_bars = False
+
+        for i in range(1, len(close)):
+            while j15 + 1 < n_15min and index_15min_ns[j15 + 1] <= index_5min_ns[i]:
+                j15 += 1
+                h_m2 = h_m1
+                h_m1 = h_forming
+                h_forming = high_15min[j15]
+                have_three_15min_bars = j15 >= 2
+
+            # We need at least one previous candle to check for signals
+            if in_trade:
+                exit_price = np.nan
+                reason = -1
+
+                # 1. Check for Stop-Loss
+                if high[i] >= sl_price:
+                    exit_price = sl_price
+                    reason = REASON_STOP_LOSS
+                else:
+                    # 2. Check for Profit Target to move SL to Breakeven
+                    if not sl_at_breakeven and low[i] <= breakeven_price:
+                        sl_price = entry_price
+                        sl_at_breakeven = True
+                        breakeven_ns[n_trades] = index_5min_ns[i]
+
+                    # 3. Check for Reverse Swing Exit Signal on 15-min chart:
+                    # the last completed candle made a higher high
+                    if have_three_15min_bars and h_m1 > h_m2:
+                        exit_price = close[i]
+                        reason = REASON_REVERSE_SWING
+
+                if reason >= 0:
+                    exit_ns[n_trades] = index_5min_ns[i]
+                    exit_price_buf[n_trades] = exit_price
+                    # PnL for a SELL trade
+                    pnl_buf[n_trades] = (entry_price - exit_price) * position_size * lot_size
+                    reason_buf[n_trades] = reason
+                    n_trades += 1
+                    in_trade = False
+
+            elif entry_signal[i]:
+                in_trade = True
+                entry_price = close[i]
+                sl_price = entry_price + sl_points # For a SELL trade, SL is higher
+                breakeven_price = entry_price - sl_points # 1:1 R/R target
+                sl_at_breakeven = False
+
+                entry_ns[n_trades] = index_5min_ns[i]
+                breakeven_ns[n_trades] = NAT_NS
+                entry_price_buf[n_trades] = entry_price
+
+        return n_trades, in_trade
+
+    return run_loop
+
 
 class Backtester:
     def __init__(self, symbol, start_date, end_date, capital, risk_percent, sl_points, lot_size=1):
@@ -15,9 +135,39 @@ class Backtester:
         self.sl_points = sl_points
         self.lot_size = lot_size
 
-        self.trades = []
         self.in_trade = False
-        self.current_trade = {}
+        self._position_size = 0
+        self._allocate_trade_buffers(0)
+
+    def _allocate_trade_buffers(self, max_trades):
+        """
+        Allocates the structure-of-arrays trade records filled by the backtest kernel.
+        """
+        self._n_trades = 0
+        self._entry_ns = np.empty(max_trades, dtype=np.int64)
+        self._exit_ns = np.empty(max_trades, dtype=np.int64)
+        self._breakeven_ns = np.empty(max_trades, dtype=np.int64)
+        self._entry_price = np.empty(max_trades, dtype=np.float64)
+        self._exit_price = np.empty(max_trades, dtype=np.float64)
+        self._pnl = np.empty(max_trades, dtype=np.float64)
+        self._reason_code = np.empty(max_trades, dtype=np.int8)
+
+    @property
+    def trades(self):
+        """
+        pd.DataFrame: The closed trades, one row per trade, viewing the trade buffers.
+        """
+        n = self._n_trades
+        return pd.DataFrame({
+            'symbol': self.symbol,
+            'entry_time': self._entry_ns[:n].view('datetime64[ns]'),
+            'exit_time': self._exit_ns[:n].view('datetime64[ns]'),
+            'entry_price': self._entry_price[:n],
+            'exit_price': self._exit_price[:n],
+            'position_size': self._position_size,
+            'pnl': self._pnl[:n],
+            'reason': pd.Categorical.from_codes(self._reason_code[:n], categories=TRADE_EXIT_REASONS)
+        }, copy=False)
 
     def _prepare_data(self):
         """
@@ -27,133 +177,125 @@ class Backtester:
         df_5min = get_historical_data(None, self.symbol, 'NSE', 'EQUITY', self.start_date, self.end_date, interval='5minute')
         if df_5min.empty:
             print("No 5-minute data available for the given period.")
-            return None, None
+            self.df_5min = None
+            return
 
         # Calculate VWAP on 5-min data
         self.df_5min = calculate_vwap(df_5min)
 
         # Resample 5-min data to 15-min
-        ohlc_15min = self.df_5min['close'].resample('15min').ohlc()
-        volume_15min = self.df_5min['volume'].resample('15min').sum()
-        df_15min = ohlc_15min.join(volume_15min)
+        df_15min = resample_ohlcv(self.df_5min, '15min')
 
         # Calculate 25 EMA on 15-min data
         self.df_15min = calculate_ema(df_15min, length=25)
 
         # Align 15-min EMA to 5-min index for signal checking
-        ema_col_name = self.df_15min.columns[-2] # EMA is the second to last column
-        self.aligned_ema = self.df_15min[ema_col_name].reindex(self.df_5min.index, method='ffill')
+        self.aligned_ema = self.df_15min['EMA_25'].reindex(self.df_5min.index, method='ffill')
+
+        # Extract the columns read by the backtest loop once, so each bar is a
+        # positional lookup instead of a DataFrame slice. Prices are float32 to
+        # halve memory traffic; SL prices and PnL are still computed in float64.
+        self.close = self.df_5min['close'].to_numpy(dtype=np.float32)
+        self.high = self.df_5min['high'].to_numpy(dtype=np.float32)
+        self.low = self.df_5min['low'].to_numpy(dtype=np.float32)
+        self.vwap = self.df_5min['VWAP'].to_numpy(dtype=np.float32)
+        self.ema = self.aligned_ema.to_numpy(dtype=np.float32)
+        self.high_15min = self.df_15min['high'].to_numpy(dtype=np.float32)
+
+        self._index_5min_ns = self.df_5min.index.asi8
+        self._index_15min_ns = self.df_15min.index.asi8
+
+        # A trade spans at least two candles, so at most half the candles can open one
+        self._allocate_trade_buffers(len(self.df_5min) // 2)
+
+        # Evaluate the entry conditions for the whole series at once (see
+        # check_entry_signal); NaN comparisons are False
+        # 1. Consolidation: the previous close was between VWAP and EMA. The
+        # band edges are computed once, in a single pass each, and kept for analysis.
+        self.lower_band = np.minimum(self.vwap, self.ema)
+        self.upper_band = np.maximum(self.vwap, self.ema)
+        consolidating = np.zeros(len(self.close), dtype=np.bool_)
+        consolidating[1:] = (self.close[:-1] > self.lower_band[:-1]) & (self.close[:-1] < self.upper_band[:-1])
+        # 2. Breakdown: the current close is below both VWAP and EMA
+        entry_breakdown = (self.close < self.vwap) & (self.close < self.ema)
+        self.entry_signal = consolidating & entry_breakdown
+
+        # Every input is fixed for the whole backtest, so every trade uses the same size
+        self._position_size = calculate_position_size(self.capital, self.risk_percent, self.sl_points, self.lot_size)
 
-    def run(self):
+    def run(self, log_trades=True):
         """
         Runs the backtest over the prepared data.
+
+        Args:
+            log_trades (bool): Print each trade's events before the summary.
+                Parallel sweeps turn this off to keep worker output short.
         """
         self._prepare_data()
 
         if self.df_5min is None:
             return
 
+        if self._position_size == 0:
+            print("Position size is zero. Skipping backtest.")
+            return
+
         print(f"\n--- Running Backtest for {self.symbol} ---")
         print(f"Period: {self.start_date} to {self.end_date}\n")
 
-        for i in range(1, len(self.df_5min)):
-            # We need at least one previous candle to check for signals
-            current_5min_slice = self.df_5min.iloc[:i+1]
-            current_15min_slice = self.df_15min[self.df_15min.index <= current_5min_slice.index[-1]]
-
-            if self.in_trade:
-                self._manage_trade(current_5min_slice, current_15min_slice)
-            else:
-                self._check_for_entry(current_5min_slice)
-
-        self._print_results()
-
-    def _check_for_entry(self, current_data_slice):
-        """
-        Checks for an entry signal at the current timestamp.
-        """
-        # Pass the 15-min EMA series to the entry signal check
-        ema_series = self.aligned_ema.loc[:current_data_slice.index[-1]]
+        run_loop = make_kernel(self.sl_points, self.lot_size)
+        n_trades, in_trade = run_loop(
+            self.close, self.high, self.low, self.entry_signal, self.high_15min,
+            self._index_5min_ns, self._index_15min_ns,
+            self._position_size,
+            self._entry_ns, self._exit_ns, self._breakeven_ns,
+            self._entry_price, self._exit_price, self._pnl, self._reason_code
+        )
+        self._n_trades = n_trades
+        self.in_trade = in_trade
 
-        if check_entry_signal(current_data_slice, ema_series):
-            self._execute_trade(current_data_slice.iloc[-1])
+        self._print_results(log_trades)
 
-    def _execute_trade(self, entry_candle):
+    def _log_trade(self, k):
         """
-        Simulates executing a trade.
+        Prints the events of the k-th trade recorded by the kernel.
         """
-        self.in_trade = True
-        entry_price = entry_candle['close']
-        entry_time = entry_candle.name
-
-        position_size = calculate_position_size(self.capital, self.risk_percent, self.sl_points, self.lot_size)
-        if position_size == 0:
-            print("Position size is zero. Skipping trade.")
-            self.in_trade = False
-            return
-
-        self.current_trade = {
-            'symbol': self.symbol,
-            'entry_time': entry_time,
-            'entry_price': entry_price,
-            'position_size': position_size,
-            'sl_price': entry_price + self.sl_points, # For a SELL trade, SL is higher
-            'breakeven_price': entry_price - self.sl_points, # 1:1 R/R target
-            'status': 'open',
-            'sl_at_breakeven': False
-        }
+        entry_time = pd.Timestamp(self._entry_ns[k])
+        entry_price = self._entry_price[k]
+        print(f"SELL SIGNAL DETECTED at {entry_time}: Price {entry_price}")
         print(f"\nNew Trade Opened @ {entry_time}:")
-        print(f"  Entry Price: {entry_price:.2f}, SL: {self.current_trade['sl_price']:.2f}")
+        print(f"  Entry Price: {entry_price:.2f}, SL: {entry_price + self.sl_points:.2f}")
 
-    def _manage_trade(self, current_5min_data, current_15min_data):
-        """
-        Manages an open trade, checking for SL, TP, or exit signals.
-        """
-        latest_candle = current_5min_data.iloc[-1]
+        if self._breakeven_ns[k] != NAT_NS:
+            print(f"  Trade Update @ {pd.Timestamp(self._breakeven_ns[k])}: SL moved to Breakeven ({entry_price:.2f})")
 
-        # 1. Check for Stop-Loss
-        if latest_candle['high'] >= self.current_trade['sl_price']:
-            self._close_trade(self.current_trade['sl_price'], latest_candle.name, "Stop-Loss Hit")
+        if k >= self._n_trades:
+            # Still open at the end of the data
             return
 
-        # 2. Check for Profit Target to move SL to Breakeven
-        if not self.current_trade['sl_at_breakeven'] and latest_candle['low'] <= self.current_trade['breakeven_price']:
-            self.current_trade['sl_price'] = self.current_trade['entry_price']
-            self.current_trade['sl_at_breakeven'] = True
-            print(f"  Trade Update @ {latest_candle.name}: SL moved to Breakeven ({self.current_trade['sl_price']:.2f})")
-
-        # 3. Check for Reverse Swing Exit Signal on 15-min chart
-        if check_exit_signal(current_15min_data):
-            self._close_trade(latest_candle['close'], latest_candle.name, "Reverse Swing Exit")
-
-    def _close_trade(self, exit_price, exit_time, reason):
-        """
-        Simulates closing an open trade.
-        """
-        self.in_trade = False
-        trade = self.current_trade
-        trade['exit_time'] = exit_time
-        trade['exit_price'] = exit_price
-        trade['status'] = 'closed'
-        trade['reason'] = reason
-
-        # PnL for a SELL trade
-        trade['pnl'] = (trade['entry_price'] - trade['exit_price']) * trade['position_size'] * self.lot_size
-
-        self.trades.append(trade)
+        exit_time = pd.Timestamp(self._exit_ns[k])
+        reason = TRADE_EXIT_REASONS[self._reason_code[k]]
+        if self._reason_code[k] == REASON_REVERSE_SWING:
+            n_15min = np.searchsorted(self._index_15min_ns, self._exit_ns[k], side='right')
+            print(f"EXIT SIGNAL (Reverse Swing) DETECTED at {self.df_15min.index[n_15min - 1]}")
         print(f"Trade Closed @ {exit_time}:")
-        print(f"  Exit Price: {exit_price:.2f}, Reason: {reason}, PnL: {trade['pnl']:.2f}\n")
+        print(f"  Exit Price: {self._exit_price[k]:.2f}, Reason: {reason}, PnL: {self._pnl[k]:.2f}\n")
 
-    def _print_results(self):
+    def _print_results(self, log_trades=True):
         """
-        Prints the summary of the backtest.
+        Prints the trade events recorded by the kernel, then the summary of the backtest.
         """
+        # The kernel only records trades; their messages are formatted here, after the loop
+        if log_trades:
+            for k in range(self._n_trades + self.in_trade):
+                self._log_trade(k)
+
         print("\n--- Backtest Results ---")
-        if not self.trades:
+        if self._n_trades == 0:
             print("No trades were executed.")
             return
 
-        results_df = pd.DataFrame(self.trades)
+        results_df = self.trades
         total_pnl = results_df['pnl'].sum()
         num_trades = len(results_df)
         wins = results_df[results_df['pnl'] > 0]
@@ -0,0 +1,33 @@
+# trading_bot/backtesting/parallel.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from trading_bot.backtesting.engine import Backtester
+
+def _run_backtest(config):
+    """
+    Runs a single backtest in a worker process and returns its trades.
+    """
+    backtester = Backtester(**config)
+    backtester.run(log_trades=False)
+    return backtester.trades
+
+def run_many(configs, max_workers=None):
+    """
+    Runs independent backtests in parallel, one worker process per backtest.
+
+    Args:
+        configs (list[dict]): Keyword arguments for Backtester, one dict per backtest.
+        max_workers (int): Number of worker processes. Defaults to os.cpu_count().
+
+    Returns:
+        list[dict]: One result per config, in the same order as `configs`,
+            with keys 'config' and 'trades'.
+    """
+    results = [None] * len(configs)
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = {executor.submit(_run_backtest, config): k for k, config in enumerate(configs)}
+        for future in as_completed(futures):
+            k = futures[future]
+            results[k] = {'config': configs[k], 'trades': future.result()}
+    return results
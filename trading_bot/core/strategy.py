@@ -1,8 +1,11 @@
 # trading_bot/core/strategy.py
 
-import pandas as pd
+import functools
+import numpy as np
 from trading_bot.config import settings
+from trading_bot.utils._njit import njit
 
+@functools.lru_cache(maxsize=128)
 def calculate_position_size(capital, risk_percent, sl_points, lot_size):
     """
     Calculates the position size (number of lots) based on risk parameters.
@@ -25,30 +28,24 @@ def calculate_position_size(capital, risk_percent, sl_points, lot_size):
     num_lots = int(max_loss_per_trade / risk_per_lot)
     return num_lots
 
-def check_entry_signal(df_5min, df_15min_ema):
+@njit(cache=True)
+def check_entry_signal(close_prev, close_curr, vwap_prev, vwap_curr, ema_prev, ema_curr):
     """
     Checks for the SELL entry signal based on the strategy rules.
 
     Args:
-        df_5min (pd.DataFrame): 5-minute OHLCV data with VWAP calculated.
-        df_15min_ema (pd.Series): 15-minute 25-period EMA values.
+        close_prev (float): Close of the previous 5-minute candle.
+        close_curr (float): Close of the current 5-minute candle.
+        vwap_prev (float): VWAP at the previous 5-minute candle.
+        vwap_curr (float): VWAP at the current 5-minute candle.
+        ema_prev (float): 15-minute 25-period EMA at the previous 5-minute candle.
+        ema_curr (float): 15-minute 25-period EMA at the current 5-minute candle.
 
     Returns:
         bool: True if a SELL signal is found, False otherwise.
     """
-    if len(df_5min) < 2 or df_15min_ema.isna().all():
-        return False
-
-    # Get the latest data
-    last_candle = df_5min.iloc[-1]
-    prev_candle = df_5min.iloc[-2]
-
-    # Align 15-min EMA to the 5-min timeframe
-    # We forward-fill the EMA value to apply it to each 5-min candle
-    aligned_ema = df_15min_ema.reindex(df_5min.index, method='ffill')
-
     # Check for valid data
-    if pd.isna(aligned_ema.iloc[-1]) or pd.isna(last_candle['VWAP']):
+    if np.isnan(ema_curr) or np.isnan(vwap_curr):
         return False
 
     # Entry condition: Price breaks below both VWAP and 15-min EMA
@@ -56,42 +53,41 @@ def check_entry_signal(df_5min, df_15min_ema):
 
     # 1. Define consolidation: Price was between VWAP and EMA previously.
     # This is a simplified check. A more robust check might look at a longer period.
-    vwap = prev_candle['VWAP']
-    ema = aligned_ema.iloc[-2]
-    upper_band = max(vwap, ema)
-    lower_band = min(vwap, ema)
+    upper_band = max(vwap_prev, ema_prev)
+    lower_band = min(vwap_prev, ema_prev)
 
-    consolidating = (prev_candle['close'] > lower_band and prev_candle['close'] < upper_band)
+    consolidating = (close_prev > lower_band and close_prev < upper_band)
 
     # 2. Define breakdown: Current price is below both VWAP and EMA.
-    breakdown = (last_candle['close'] < last_candle['VWAP'] and last_candle['close'] < aligned_ema.iloc[-1])
+    breakdown = (close_curr < vwap_curr and close_curr < ema_curr)
 
     if consolidating and breakdown:
-        print(f"SELL SIGNAL DETECTED at {last_candle.name}: Price {last_candle['close']}")
         return True
 
     return False
 
-def check_exit_signal(df_15min):
+@njit(cache=True)
+def check_exit_signal(high_15min, n):
     """
     Checks for the exit signal (reverse swing) on the 15-min chart.
 
     Args:
-        df_15min (pd.DataFrame): 15-minute OHLC data.
+        high_15min (np.ndarray): 15-minute high prices.
+        n (int): Number of 15-minute candles formed so far. Candle n-1 is the
+            one still forming.
 
     Returns:
         bool: True if an exit signal is found, False otherwise.
     """
-    if len(df_15min) < 3:
+    if n < 3:
         return False
 
     # A "reverse swing" in a downtrend is a higher high.
     # We check if the last completed candle's high is greater than the previous one's.
-    last_high = df_15min.iloc[-2]['high']
-    prev_high = df_15min.iloc[-3]['high']
+    last_high = high_15min[n - 2]
+    prev_high = high_15min[n - 3]
 
     if last_high > prev_high:
-        print(f"EXIT SIGNAL (Reverse Swing) DETECTED at {df_15min.iloc[-1].name}")
         return True
 
     return False
@@ -141,41 +137,17 @@ if __name__ == '__main__':
     print(f"Calculated position size: {lots} lots for Bank Nifty (Lot Size: {banknifty_lot_size})")
 
     # 2. Entry/Exit Signal Check (using sample data)
-    # Create sample dataframes
-    from trading_bot.utils.indicators import calculate_vwap, calculate_ema
-
-    # Sample 5-min data
-    data_5min = {
-        'open':  [101, 102, 101, 100],
-        'high':  [103, 103, 102, 101],
-        'low':   [100, 101, 100, 99],
-        'close': [102, 101.5, 101.2, 99],
-        'volume':[1000, 1100, 1200, 1500]
-    }
-    idx_5min = pd.to_datetime(['2023-01-01 09:20', '2023-01-01 09:25', '2023-01-01 09:30', '2023-01-01 09:35'])
-    df_5min = pd.DataFrame(data_5min, index=idx_5min)
-    df_5min = calculate_vwap(df_5min)
-
-    # Sample 15-min data for EMA
-    data_15min = {'close': [102, 101]}
-    idx_15min = pd.to_datetime(['2023-01-01 09:15', '2023-01-01 09:30'])
-    df_15min = pd.DataFrame(data_15min, index=idx_15min)
-    df_15min = calculate_ema(df_15min, length=25)
-
-    # Set VWAP and EMA to create a signal
-    df_5min['VWAP'] = [101.8, 101.7, 101.6, 101.5]
-    df_15min[df_15min.columns[-1]] = [101.9, 101.8] # EMA column
+    # Sample 5-min closes and VWAP, with the 15-min EMA forward-filled onto the 5-min candles
+    close = np.array([102, 101.5, 101.2, 99])
+    vwap = np.array([101.8, 101.7, 101.6, 101.5])
+    ema = np.array([101.9, 101.9, 101.8, 101.8])
 
     print("\nChecking for entry signal...")
-    signal = check_entry_signal(df_5min, df_15min.iloc[:, -1])
+    signal = check_entry_signal(close[-2], close[-1], vwap[-2], vwap[-1], ema[-2], ema[-1])
     print(f"Entry signal found: {signal}")
 
-    # Sample 15-min data for exit check
-    exit_check_data = {
-        'open': [100, 98, 97], 'high': [101, 99, 100],
-        'low': [98, 97, 96], 'close': [99, 97, 98], 'volume': [1,1,1]
-    }
-    exit_df = pd.DataFrame(exit_check_data, index=pd.to_datetime(['09:45', '10:00', '10:15']))
+    # Sample 15-min highs for exit check
+    high_15min = np.array([101, 99, 100])
     print("\nChecking for exit signal...")
-    exit_signal = check_exit_signal(exit_df)
+    exit_signal = check_exit_signal(high_15min, len(high_15min))
     print(f"Exit signal found: {exit_signal}")
\ No newline at end of file
@@ -0,0 +1,19 @@
+# trading_bot/utils/_njit.py
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """
+        Stand-in for numba.njit when numba is not installed.
+
+        Supports both the bare `@njit` and the `@njit(cache=True)` forms and
+        returns the function unchanged, so it runs as plain Python.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -1,24 +1,92 @@
 # trading_bot/utils/indicators.py
 
+import functools
+import zlib
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+from joblib import Memory
+from trading_bot.utils._njit import njit
+
+# On-disk cache for get_historical_data, shared across runs
+_historical_data_memory = Memory(location='.cache/histdata', verbose=0)
 
 def calculate_vwap(df):
     """
     Calculates the Volume Weighted Average Price (VWAP).
 
+    The VWAP is anchored to each trading day: cumsum(typical_price * volume) /
+    cumsum(volume), restarting at the first candle of every session.
+
     Args:
         df (pd.DataFrame): DataFrame with columns ['high', 'low', 'close', 'volume'].
 
     Returns:
         pd.DataFrame: DataFrame with an added 'VWAP' column.
     """
-    df.ta.vwap(append=True)
-    # pandas-ta names the column 'VWAP_D'. We'll rename it for consistency.
-    if 'VWAP_D' in df.columns:
-        df.rename(columns={'VWAP_D': 'VWAP'}, inplace=True)
+    if df.empty:
+        df['VWAP'] = np.nan
+        return df
+
+    tp = (df['high'].to_numpy(dtype=np.float64) + df['low'].to_numpy(dtype=np.float64)
+          + df['close'].to_numpy(dtype=np.float64)) / 3.0
+    v = df['volume'].to_numpy(dtype=np.float64)
+    tpv = tp * v
+
+    # The index is sorted, so each session is a contiguous run starting at session_start
+    _, session_start, session_id = np.unique(df.index.normalize().asi8, return_index=True, return_inverse=True)
+
+    # Turn the running totals into per-session ones by removing everything before the session
+    cumsum_tpv = np.cumsum(tpv)
+    cumsum_v = np.cumsum(v)
+    cumsum_tpv -= np.concatenate(([0.0], np.cumsum(np.add.reduceat(tpv, session_start))[:-1]))[session_id]
+    cumsum_v -= np.concatenate(([0.0], np.cumsum(np.add.reduceat(v, session_start))[:-1]))[session_id]
+
+    # Accumulate in float64 to keep the long running sums exact; store as float32
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['VWAP'] = (cumsum_tpv / cumsum_v).astype(np.float32)
     return df
 
+@njit(cache=True)
+def _ema_core(x, length):
+    """
+    Computes an EMA of `x` seeded with the SMA of its first `length` values.
+
+    The recurrence runs on float64 scalars; the output is float32.
+
+    Matches pandas-ta's ema(): values before the seed are NaN, and NaN inputs
+    are carried over the same way as pandas' ewm(adjust=False).
+    """
+    n = len(x)
+    out = np.full(n, np.nan, dtype=np.float32)
+    if n < length:
+        return out
+
+    alpha = 2.0 / (length + 1)
+
+    total = 0.0
+    count = 0
+    for k in range(length):
+        if not np.isnan(x[k]):
+            total += x[k]
+            count += 1
+    ema = total / count if count > 0 else np.nan
+    out[length - 1] = ema
+
+    # Weight of the running EMA relative to the next observation, decayed across NaN gaps
+    old_weight = 1.0
+    for i in range(length, n):
+        value = x[i]
+        if not np.isnan(ema):
+            old_weight *= 1.0 - alpha
+            if not np.isnan(value):
+                if ema != value:
+                    ema = (old_weight * ema + alpha * value) / (old_weight + alpha)
+                old_weight = 1.0
+        elif not np.isnan(value):
+            ema = value
+        out[i] = ema
+    return out
+
 def calculate_ema(df, length=25):
     """
     Calculates the Exponential Moving Average (EMA).
@@ -28,12 +96,106 @@ def calculate_ema(df, length=25):
         length (int): The time period for the EMA.
 
     Returns:
-        pd.DataFrame: DataFrame with an added 'EMA' column.
+        pd.DataFrame: DataFrame with an added 'EMA_{length}' column.
     """
-    df.ta.ema(length=length, append=True)
+    df[f'EMA_{length}'] = _ema_core(df['close'].to_numpy(dtype=np.float32), length)
     return df
 
-def get_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval='5minute'):
+def resample_ohlcv(df, rule='15min', max_gap='1D'):
+    """
+    Resamples OHLCV candles to a higher timeframe in a single aggregation pass.
+
+    The data is split at gaps longer than `max_gap` (weekends, holidays) and each
+    contiguous block is resampled on its own, so no empty bins are allocated for
+    the gaps. Bins without any candles are dropped.
+
+    Args:
+        df (pd.DataFrame): DataFrame with columns ['open', 'high', 'low', 'close', 'volume'].
+        rule (str): The target timeframe (e.g., '15min').
+        max_gap (str): Gaps longer than this start a new block.
+
+    Returns:
+        pd.DataFrame: Resampled OHLCV DataFrame.
+    """
+    agg = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+    gaps = np.flatnonzero(np.diff(df.index.asi8) > pd.Timedelta(max_gap).value) + 1
+    starts = np.concatenate(([0], gaps))
+    ends = np.concatenate((gaps, [len(df)]))
+    blocks = [df.iloc[start:end].resample(rule).agg(agg) for start, end in zip(starts, ends)]
+
+    return pd.concat(blocks).dropna()
+
+class StreamingVWAP:
+    """
+    Session VWAP updated one candle at a time, for live trading.
+
+    Each update is O(1); the running sums reset at the first candle of a new day.
+    """
+    def __init__(self):
+        self.cum_tpv = 0.0
+        self.cum_v = 0.0
+        self.session_date = None
+
+    def update(self, high, low, close, volume, timestamp):
+        """
+        Adds a completed candle and returns the VWAP including it.
+
+        Args:
+            high (float): Candle high.
+            low (float): Candle low.
+            close (float): Candle close.
+            volume (float): Candle volume.
+            timestamp: Candle timestamp, used to detect a new session.
+
+        Returns:
+            float: The current session VWAP.
+        """
+        session_date = pd.Timestamp(timestamp).date()
+        if session_date != self.session_date:
+            self.cum_tpv = 0.0
+            self.cum_v = 0.0
+            self.session_date = session_date
+
+        self.cum_tpv += (high + low + close) / 3.0 * volume
+        self.cum_v += volume
+        return self.cum_tpv / self.cum_v if self.cum_v else np.nan
+
+class StreamingEMA:
+    """
+    EMA updated one value at a time, for live trading.
+
+    Matches calculate_ema: NaN until `length` values have been seen, then seeded
+    with their SMA and updated with the usual recurrence.
+    """
+    def __init__(self, length=25):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.prev = np.nan
+        self._seed_sum = 0.0
+        self._seed_count = 0
+
+    def update(self, x):
+        """
+        Adds a new value (e.g., a completed 15-min close) and returns the EMA including it.
+
+        Args:
+            x (float): The new value.
+
+        Returns:
+            float: The current EMA, or NaN while still seeding.
+        """
+        if self._seed_count < self.length:
+            self._seed_sum += x
+            self._seed_count += 1
+            if self._seed_count == self.length:
+                self.prev = self._seed_sum / self.length
+            return self.prev
+
+        self.prev = self.alpha * x + (1 - self.alpha) * self.prev
+        return self.prev
+
+def get_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval='5minute', cache_bypass=False):
     """
     Fetches historical data for a given symbol.
 
@@ -41,6 +203,10 @@ def get_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_d
     specific function provided by the dhanhq library to fetch historical data.
     You might need to adjust the parameters and function calls accordingly.
 
+    Results are memoized in-process and on disk under .cache/histdata. The disk
+    cache is keyed on every argument except `dhan`. Each call returns its own
+    copy, so callers are free to add columns to it.
+
     Args:
         dhan: An initialized DhanHQ API instance.
         symbol (str): The stock or index symbol.
@@ -49,10 +215,26 @@ def get_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_d
         from_date (str): The start date in 'YYYY-MM-DD' format.
         to_date (str): The end date in 'YYYY-MM-DD' format.
         interval (str): The data interval (e.g., '5minute', '15minute').
+        cache_bypass (bool): Skip the cache and always fetch fresh data (e.g., in live mode).
 
     Returns:
         pd.DataFrame: A DataFrame with historical OHLCV data.
     """
+    if cache_bypass:
+        return _fetch_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval)
+    return _cached_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval).copy()
+
+@functools.lru_cache(maxsize=32)
+def _cached_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval):
+    """
+    In-process cache in front of the on-disk cache. The returned DataFrame is shared; do not mutate it.
+    """
+    return _persistent_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval)
+
+def _fetch_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_date, interval):
+    """
+    Fetches historical data without any caching. See get_historical_data.
+    """
     print(f"Fetching {interval} historical data for {symbol} from {from_date} to {to_date}...")
 
     # This is a simulated response. In a real scenario, you would call a function like:
@@ -66,20 +248,49 @@ def get_historical_data(dhan, symbol, exchange, instrument_type, from_date, to_d
     # And for intraday:
     # data = dhan.intraday_daily_minute_charts(...)
 
-    # Creating a sample DataFrame for demonstration purposes.
+    # Simulating candles for demonstration purposes: a random walk over the
+    # trading sessions (09:15-15:30 on weekdays) between from_date and to_date.
     # The actual data will have columns like 'open', 'high', 'low', 'close', 'volume'.
-    data = {
-        'date': pd.to_datetime(['2023-01-01 09:15:00', '2023-01-01 09:20:00', '2023-01-01 09:25:00', '2023-01-01 09:30:00']),
-        'open': [100, 102, 101, 103],
-        'high': [103, 104, 103, 105],
-        'low': [99, 101, 100, 102],
-        'close': [102, 103, 102, 104],
-        'volume': [1000, 1200, 1100, 1300]
-    }
-    df = pd.DataFrame(data)
-    df.set_index('date', inplace=True)
+    # Prices are float32 and volumes int32, which is ample precision for intraday
+    # signals and halves the memory traffic of every scan.
+    step = pd.Timedelta(minutes=int(interval.replace('minute', '')))
+    sessions = pd.bdate_range(from_date, to_date).asi8
+    offsets = np.arange(pd.Timedelta('9h15min').value, pd.Timedelta('15h30min').value, step.value)
+    index = pd.DatetimeIndex((sessions[:, None] + offsets[None, :]).ravel(), name='date')
+    n = len(index)
+
+    # Seeded per symbol so repeated calls (and the cache) see the same data
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+
+    # One column-major buffer for open/high/low/close; each column is contiguous,
+    # so the generator fills it in place and the DataFrame wraps it without a copy
+    ohlc = np.empty((n, 4), dtype=np.float32, order='F')
+    open_, high, low, close = (ohlc[:, k] for k in range(4))
+
+    # Close: a geometric random walk with ~0.05% moves per candle
+    rng.standard_normal(n, dtype=np.float32, out=close)
+    close *= 0.05 / 100
+    close += 1
+    np.cumprod(close, out=close)
+    close *= 45000
+
+    # Open at the previous close; wicks extend up to ~0.03% beyond the body
+    if n:
+        open_[0] = 45000
+        open_[1:] = close[:-1]
+    rng.random(n, dtype=np.float32, out=high)
+    high *= 45000 * 0.03 / 100
+    high += np.maximum(open_, close)
+    rng.random(n, dtype=np.float32, out=low)
+    low *= -45000 * 0.03 / 100
+    low += np.minimum(open_, close)
+
+    df = pd.DataFrame(ohlc, index=index, columns=['open', 'high', 'low', 'close'], copy=False)
+    df['volume'] = rng.integers(1000, 5000, n, dtype=np.int32)
     return df
 
+_persistent_historical_data = _historical_data_memory.cache(_fetch_historical_data, ignore=['dhan'])
+
 if __name__ == '__main__':
     # Example usage:
     # Create a sample DataFrame
@@ -100,10 +311,21 @@ if __name__ == '__main__':
     print(df_5min_with_vwap.head())
 
     # Resample to 15-min for EMA calculation
-    df_15min = df_5min['close'].resample('15min').ohlc()
-    df_15min['volume'] = df_5min['volume'].resample('15min').sum()
+    df_15min = resample_ohlcv(df_5min, '15min')
 
     # Calculate 25-period EMA on 15-min data
     df_15min_with_ema = calculate_ema(df_15min.copy(), length=25)
     print("\n15-min DataFrame with 25 EMA:")
-    print(df_15min_with_ema.head())
\ No newline at end of file
+    print(df_15min_with_ema.head())
+
+    # The streaming indicators give the same values one candle at a time
+    vwap_stream = StreamingVWAP()
+    for ts, row in df_5min.iterrows():
+        vwap = vwap_stream.update(row['high'], row['low'], row['close'], row['volume'], ts)
+    print(f"\nStreaming VWAP: {vwap:.4f} (batch: {df_5min_with_vwap['VWAP'].iloc[-1]:.4f})")
+
+    ema_stream = StreamingEMA(length=5)
+    for close in df_15min['close']:
+        ema = ema_stream.update(close)
+    batch_ema = calculate_ema(df_15min.copy(), length=5)['EMA_5'].iloc[-1]
+    print(f"Streaming 5 EMA: {ema:.4f} (batch: {batch_ema:.4f})")
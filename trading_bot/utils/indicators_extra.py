@@ -0,0 +1,21 @@
+# trading_bot/utils/indicators_extra.py
+
+# Optional pandas-ta indicators.
+# The strategy only needs VWAP and EMA, which indicators.py implements without
+# pandas-ta. Any future indicator that relies on pandas-ta goes here, so its
+# import cost is only paid by code that uses it.
+try:
+    import pandas_ta as ta
+except ImportError:
+    ta = None
+
+def require_pandas_ta():
+    """
+    Returns the pandas_ta module.
+
+    Raises:
+        ImportError: If pandas-ta is not installed.
+    """
+    if ta is None:
+        raise ImportError("pandas-ta is not installed. Install it with 'pip install pandas-ta' to use these indicators.")
+    return ta